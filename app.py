@@ -1,124 +1,351 @@
 import streamlit as st
-import requests
-from typing import List, Dict, Optional, Any
-import pandas as pd
+import httpx
+import orjson
+import ijson
+import functools
+import csv
+import io
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Optional, Any
 import time
 
+# pandas is only needed to render tables, so it is imported on first use to keep
+# the login and RFID pages from paying its import cost on a cold start.
+if TYPE_CHECKING:
+    import pandas as pd
+
 # --- Configuration ---
 API_BASE_URL = "https://testys-clearance-sys.hf.space"  # Replace with your deployed backend URL
+REQUEST_TIMEOUT = httpx.Timeout(10.0, connect=3.05)  # Fail fast instead of freezing the script
+# A bulk import hashes one password per student, so it gets a longer read timeout.
+BULK_IMPORT_TIMEOUT = httpx.Timeout(60.0, connect=3.05)
+BULK_IMPORT_CHUNK_SIZE = 100  # Matches the backend's default BULK_IMPORT_MAX_STUDENTS
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 0.3
+RETRY_STATUSES = {502, 503, 504}
+# Pages accessible by all logged-in users (Staff + Admin); only admins get Super Admin.
+STAFF_PAGES = ("Student Management", "RFID Management")
+PAGES_BY_ROLE = {
+    "admin": STAFF_PAGES + ("Super Admin",),
+    "staff": STAFF_PAGES,
+}
+STUDENT_PAGE_SIZE = 100  # Students this client requests per /admin/students/ call (sent as limit)
+SCAN_POLL_INTERVAL_SECONDS = 1
+SCAN_TIMEOUT_SECONDS = 30
+
+# --- HTTP Client ---
+class RetryTransport(httpx.HTTPTransport):
+    """Retries transient gateway errors (e.g. a cold-starting Space) with exponential backoff."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(RETRY_ATTEMPTS):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS - 1:
+                return response
+            response.close()
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+        return response
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """
+    Returns a pooled HTTP/2 httpx.Client shared across Streamlit reruns. Requests to
+    the backend are multiplexed over a reused TLS connection instead of opening a new
+    connection per call.
+    """
+    # The pool is configured on the transport: httpx.Client ignores http2= and limits=
+    # when it is given an explicit transport.
+    transport = RetryTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=REQUEST_TIMEOUT,
+        # Ask for compressed list responses; httpx decodes brotli when the package is installed.
+        headers={"Accept-Encoding": "br, gzip"},
+    )
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Returns a thread pool shared across reruns for concurrent API calls."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="api")
+
+def parallel_fetch(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Runs independent API calls concurrently and returns their results by key,
+    so a rerun waits for the slowest call instead of the sum of all of them.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(call: Callable[[], Any]) -> Any:
+        # Worker threads need the script context to use st.session_state / st.error.
+        add_script_run_ctx(ctx=ctx)
+        return call()
+
+    executor = get_executor()
+    futures = {executor.submit(run, call): key for key, call in calls.items()}
+    return {futures[future]: future.result() for future in as_completed(futures)}
+
+# --- Cached GET Requests ---
+class _ResponseError(Exception):
+    """Raised from cached fetchers so that failed responses are never cached."""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(response.status_code)
+        self.response = response
+
+def parse_json(response: httpx.Response) -> Any:
+    """Parses a response body once with orjson; an empty body parses to None."""
+    return orjson.loads(response.content) if response.content else None
+
+def _get_json(url: str, token: str) -> Any:
+    response = get_http_client().get(url, headers={"Authorization": f"Bearer {token}"})
+    if not 200 <= response.status_code < 300:
+        raise _ResponseError(response)
+    return parse_json(response)
+
+# Keyed on the bearer token so every user gets their own cache entries.
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_current_user(base_url: str, token: str) -> Dict[str, Any]:
+    return _get_json(f"{base_url}/users/me", token)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_all_devices(base_url: str, token: str) -> List[Dict[str, Any]]:
+    return _get_json(f"{base_url}/admin/devices/", token)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_all_users(base_url: str, token: str) -> List[Dict[str, Any]]:
+    return _get_json(f"{base_url}/admin/users/", token)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_device_options(base_url: str, token: str) -> Dict[str, int]:
+    """Maps each device's display label to its ID for the scanner selectbox."""
+    devices = _get_all_devices(base_url, token)
+    return {f"{d['device_name']} ({d['location']})": d['id'] for d in devices}
+
+def handle_timeouts(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Turns a backend timeout into a toast and a None result instead of a crashed rerun."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except httpx.TimeoutException:
+            st.toast("The backend is slow to respond. Please try again in a moment.")
+            return None
+    return wrapper
 
 # --- API Client ---
 class APIClient:
     """A client to interact with the FastAPI backend."""
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, token: Optional[str] = None):
         self.base_url = base_url
-        self.headers = {"Content-Type": "application/json"}
-        # Always use the latest token from session state if it exists
-        if "token" in st.session_state and st.session_state.token:
-            self.headers["Authorization"] = f"Bearer {st.session_state.token}"
+        self.token = token
+        self.http = get_http_client()
+        # Only the auth header is per-client; httpx sets Content-Type from json=/data=.
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
 
-    def _handle_response(self, response: requests.Response) -> Optional[Dict[str, Any]]:
+    def _handle_response(self, response: httpx.Response) -> Optional[Dict[str, Any]]:
         """Handles HTTP responses, showing errors in Streamlit."""
         if 200 <= response.status_code < 300:
             if response.status_code == 204: # No Content
                 return {"status": "success"}
-            return response.json()
-        else:
+            return parse_json(response)
+        # Don't show auth errors on every check, only on explicit actions
+        if response.status_code not in [401, 403]:
             try:
-                error_data = response.json()
+                error_data = parse_json(response) or {}
                 detail = error_data.get("detail", "Unknown error")
-                # Don't show auth errors on every check, only on explicit actions
-                if response.status_code not in [401, 403]:
-                    st.error(f"API Error ({response.status_code}): {detail}")
-            except requests.exceptions.JSONDecodeError:
-                 if response.status_code not in [401, 403]:
-                    st.error(f"API Error ({response.status_code}): {response.text}")
-            return None
+            except orjson.JSONDecodeError:
+                detail = response.text
+            st.error(f"API Error ({response.status_code}): {detail}")
+        return None
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Sends a request to the backend over the shared, pooled HTTP client."""
+        return self.http.request(method, f"{self.base_url}{path}", headers=self.headers, **kwargs)
 
+    def _cached_get(self, fetch: Callable[[str, str], Any]) -> Optional[Any]:
+        """Calls a cached GET fetcher, routing failures through _handle_response."""
+        try:
+            return fetch(self.base_url, self.token)
+        except _ResponseError as exc:
+            return self._handle_response(exc.response)
+
+    @handle_timeouts
     def login(self, username, password) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/token"
         data = {"username": username, "password": password}
-        response = requests.post(url, data=data) # Form data for token endpoint
+        response = self._request("POST", "/token", data=data) # Form data for token endpoint
         # Handle login response separately to show specific errors
         if response.status_code == 200:
-            return response.json()
+            return parse_json(response)
         else:
             st.error("Login failed. Please check your username and password.")
             return None
 
+    @handle_timeouts
     def get_current_user(self) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/users/me"
-        # Ensure headers are updated for this specific call
-        if "token" in st.session_state and st.session_state.token:
-            self.headers["Authorization"] = f"Bearer {st.session_state.token}"
-            response = requests.get(url, headers=self.headers)
-            return self._handle_response(response)
+        if self.token:
+            return self._cached_get(_get_current_user)
         return None
 
-    def get_all_students(self) -> List[Dict[str, Any]]:
+    def iter_students(self) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the student list page by page, yielding each record as soon as it has
+        been parsed instead of buffering the whole JSON array first.
+        """
         url = f"{self.base_url}/admin/students/"
-        response = requests.get(url, headers=self.headers)
-        data = self._handle_response(response)
-        return data if data else []
+        skip = 0
+        while True:
+            params = {"skip": skip, "limit": STUDENT_PAGE_SIZE}
+            with self.http.stream("GET", url, headers=self.headers, params=params) as response:
+                if not 200 <= response.status_code < 300:
+                    response.read()
+                    self._handle_response(response)
+                    return
+                students = ijson.sendable_list()
+                parser = ijson.items_coro(students, "item")
+                received = 0
+                for chunk in response.iter_bytes():
+                    parser.send(chunk)
+                    received += len(students)
+                    yield from students
+                    del students[:]
+                parser.close()
+                received += len(students)
+                yield from students
+            # A short page is the last one.
+            if received < STUDENT_PAGE_SIZE:
+                return
+            skip += STUDENT_PAGE_SIZE
+
+    @handle_timeouts
+    def get_all_students(self) -> List[Dict[str, Any]]:
+        return list(self.iter_students())
 
+    @handle_timeouts
     def create_student(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/admin/students/"
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self._request("POST", "/admin/students/", json=data)
         return self._handle_response(response)
     
+    @handle_timeouts
+    def create_students_bulk(self, students: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        response = self._request("POST", "/admin/students/bulk", json=students, timeout=BULK_IMPORT_TIMEOUT)
+        return self._handle_response(response)
+
+    @handle_timeouts
     def lookup_student(self, matric_no: str) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/admin/students/lookup?matric_no={matric_no}"
-        response = requests.get(url, headers=self.headers)
+        # Passed as params so matric numbers containing "/" are URL-encoded.
+        response = self._request("GET", "/admin/students/lookup", params={"matric_no": matric_no})
         return self._handle_response(response)
 
+    @handle_timeouts
     def update_clearance(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/clearance/"
-        response = requests.put(url, json=data, headers=self.headers)
+        # Returns the updated student record, saving a follow-up lookup.
+        response = self._request("PUT", "/clearance/with-student", json=data)
         return self._handle_response(response)
 
+    @handle_timeouts
     def link_tag(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/admin/tags/link"
-        response = requests.post(url, json=data, headers=self.headers)
+        response = self._request("POST", "/admin/tags/link", json=data)
         return self._handle_response(response)
 
+    @handle_timeouts
     def unlink_tag(self, tag_id: str) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/admin/tags/{tag_id}/unlink"
-        response = requests.delete(url, headers=self.headers)
+        response = self._request("DELETE", f"/admin/tags/{tag_id}/unlink")
         return self._handle_response(response)
         
+    @handle_timeouts
+    def get_all_users(self) -> List[Dict[str, Any]]:
+        data = self._cached_get(_get_all_users)
+        return data if data else []
+
+    @handle_timeouts
     def get_all_devices(self) -> List[Dict[str, Any]]:
-        url = f"{self.base_url}/admin/devices/"
-        response = requests.get(url, headers=self.headers)
-        data = self._handle_response(response)
+        data = self._cached_get(_get_all_devices)
         return data if data else []
 
-    def create_device(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        url = f"{self.base_url}/admin/devices/"
-        response = requests.post(url, json=data, headers=self.headers)
-        return self._handle_response(response)
+    @handle_timeouts
+    def get_device_options(self) -> Dict[str, int]:
+        data = self._cached_get(_get_device_options)
+        return data if data else {}
 
+    @handle_timeouts
+    def create_device(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = self._request("POST", "/admin/devices/", json=data)
+        result = self._handle_response(response)
+        if result:
+            _get_all_devices.clear()
+            _get_device_options.clear()
+        return result
+
+    @handle_timeouts
     def activate_scanner(self, device_id: int) -> bool:
-        url = f"{self.base_url}/admin/scanners/activate"
-        response = requests.post(url, json={"device_id": device_id}, headers=self.headers)
+        response = self._request("POST", "/admin/scanners/activate", json={"device_id": device_id})
         if not (200 <= response.status_code < 300):
             self._handle_response(response) # Show error
         return response.status_code == 204
 
+    @handle_timeouts
     def retrieve_scanned_tag(self) -> Optional[str]:
-        url = f"{self.base_url}/admin/scanners/retrieve"
-        response = requests.get(url, headers=self.headers)
+        response = self._request("GET", "/admin/scanners/retrieve")
         if response.status_code == 404: # It's okay if no tag is found yet
             return None
         data = self._handle_response(response)
         return data.get("tag_id") if data else None
 
+# --- Data Frames ---
+STATUS_DTYPES = {"department": "category", "status": "category", "remarks": "string"}
+STATUS_COLUMN_CONFIG = {
+    "department": st.column_config.TextColumn("Department"),
+    "status": st.column_config.TextColumn("Status"),
+    "remarks": st.column_config.TextColumn("Remarks"),
+}
+DEVICE_DTYPES = {
+    "id": "Int64",
+    "device_name": "string",
+    "location": "string",
+    "department": "category",
+    "api_key": "string",
+    "is_active": "boolean",
+}
+DEVICE_COLUMN_CONFIG = {
+    "id": st.column_config.NumberColumn("ID"),
+    "device_name": st.column_config.TextColumn("Device Name"),
+    "location": st.column_config.TextColumn("Location"),
+    "department": st.column_config.TextColumn("Department"),
+    "api_key": st.column_config.TextColumn("API Key"),
+    "is_active": st.column_config.CheckboxColumn("Active"),
+}
+
+@st.cache_data(show_spinner=False)
+def build_status_df(statuses_json: bytes) -> "pd.DataFrame":
+    """
+    Builds the clearance status table once per distinct payload. Takes the statuses
+    as JSON bytes so the cache key is cheap to hash, and pins column dtypes up front.
+    """
+    import pandas as pd
+    return pd.DataFrame(orjson.loads(statuses_json), columns=list(STATUS_DTYPES)).astype(STATUS_DTYPES)
+
+@st.cache_data(show_spinner=False)
+def build_devices_df(devices_json: bytes) -> "pd.DataFrame":
+    """Builds the registered devices table once per distinct payload, with pinned dtypes."""
+    import pandas as pd
+    return pd.DataFrame(orjson.loads(devices_json), columns=list(DEVICE_DTYPES)).astype(DEVICE_DTYPES)
+
 # --- Main App ---
 
 st.set_page_config(page_title="Clearance System Dashboard", layout="wide")
 
-# Initialize API client. Re-initialized on each run to get latest token.
-client = APIClient(API_BASE_URL)
+@st.cache_resource(max_entries=100)
+def get_client(token: Optional[str]) -> APIClient:
+    """Returns the API client for a token; a new one is only built on login/logout."""
+    return APIClient(API_BASE_URL, token)
+
+client = get_client(st.session_state.get("token"))
 
 def show_login_page():
     st.title("Admin & Staff Login")
@@ -134,13 +361,70 @@ def show_login_page():
                 st.session_state.user = None # Force re-fetch of user
                 st.rerun()
 
+@handle_timeouts
+def render_all_students():
+    """
+    Renders the student list progressively: each page of rows is appended to the
+    table as it arrives, so earlier rows are never re-sent to the browser.
+    """
+    placeholder = st.empty()
+    table = None
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        nonlocal table
+        # st.dataframe takes the parsed records as-is, so no intermediate DataFrame is built.
+        if table is None:
+            table = placeholder.dataframe(batch, use_container_width=True)
+        else:
+            table.add_rows(batch)
+        batch.clear()
+
+    for student in client.iter_students():
+        batch.append(student)
+        if len(batch) == STUDENT_PAGE_SIZE:
+            flush()
+    if batch:
+        flush()
+    if table is None:
+        placeholder.info("No students have been registered yet.")
+
 def display_student_dashboard():
     st.header("Student Clearance Management")
     
+    with st.expander("All Students", expanded=False):
+        if st.button("Load Students"):
+            render_all_students()
+
+    with st.expander("Bulk Import Students", expanded=False):
+        st.caption("CSV columns: full_name, matric_no, email, department, password")
+        uploaded = st.file_uploader("Student CSV", type="csv")
+        if uploaded and st.button("Import Students"):
+            rows = list(csv.DictReader(io.TextIOWrapper(uploaded, encoding="utf-8-sig")))
+            # One request per chunk of students instead of one per student; the backend
+            # caps how many students a single request may create.
+            imported = 0
+            progress = st.progress(0.0)
+            for start in range(0, len(rows), BULK_IMPORT_CHUNK_SIZE):
+                created = client.create_students_bulk(rows[start:start + BULK_IMPORT_CHUNK_SIZE])
+                if not created:
+                    break
+                imported += len(created)
+                progress.progress(imported / len(rows))
+            if imported == len(rows):
+                st.success(f"Imported {imported} students.")
+            elif imported:
+                # Each chunk is its own transaction, so earlier chunks stay imported.
+                st.warning(f"Imported {imported} of {len(rows)} students; the rest were not imported.")
+
     st.subheader("Update Student Clearance")
     
-    matric_no_input = st.text_input("Enter Matriculation Number to find a student", key="lookup_matric")
-    if matric_no_input:
+    # A form only submits on the button press, so typing doesn't trigger a lookup per keystroke.
+    with st.form("lookup_form"):
+        matric_no_input = st.text_input("Enter Matriculation Number to find a student", key="lookup_matric")
+        lookup_submitted = st.form_submit_button("Lookup")
+
+    if lookup_submitted and matric_no_input:
         student = client.lookup_student(matric_no_input)
         st.session_state.selected_student = student # Store result, even if None
                 
@@ -150,9 +434,9 @@ def display_student_dashboard():
 
         statuses = student.get('clearance_statuses', [])
         if statuses:
-            df = pd.DataFrame(statuses)
+            df = build_status_df(orjson.dumps(statuses, option=orjson.OPT_SORT_KEYS))
             st.write("Current Clearance Status:")
-            st.dataframe(df, use_container_width=True)
+            st.dataframe(df, use_container_width=True, column_config=STATUS_COLUMN_CONFIG)
         else:
             st.info("No clearance records found for this student.")
         
@@ -178,52 +462,59 @@ def display_student_dashboard():
                     result = client.update_clearance(update_data)
                     if result:
                         st.success(f"Successfully updated {dept_to_update} to {new_status}.")
-                        st.session_state.selected_student = client.lookup_student(student['matric_no'])
+                        st.session_state.selected_student = result
                         st.rerun()
 
-def display_rfid_dashboard():
-    st.header("RFID Tag Management")
-    
-    # Initialize session state for the scanning workflow
-    if 'scan_active' not in st.session_state:
+@st.fragment(run_every=SCAN_POLL_INTERVAL_SECONDS)
+def poll_scanned_tag():
+    """
+    Polls the backend for the tag scanned by the armed device. Only this fragment
+    reruns on each tick; the whole page reruns once a tag arrives or the scan times out.
+    """
+    if not st.session_state.get("scan_active"):
+        return
+
+    elapsed = time.monotonic() - st.session_state.get("scan_started_at", time.monotonic())
+    if elapsed > SCAN_TIMEOUT_SECONDS:
         st.session_state.scan_active = False
+        st.session_state.scan_timed_out = True
+        st.rerun()
 
-    devices = client.get_all_devices()
-    if not devices:
-        st.warning("No RFID scanners registered. Please add one in the Device Management panel.")
-        return
+    tag_id = client.retrieve_scanned_tag()
+    if tag_id:
+        st.session_state.scanned_tag_id = tag_id
+        st.session_state.scan_active = False  # Deactivate after successful fetch
+        st.rerun()
+
+    remaining = int(SCAN_TIMEOUT_SECONDS - elapsed)
+    st.info(f"Scanner is active. Please tap a card on the selected device now. ({remaining}s left)")
 
-    device_options = {f"{d['device_name']} ({d['location']})": d['id'] for d in devices}
+@st.fragment
+def scan_workflow(device_options: Dict[str, int]):
+    """
+    The scanner arming and tag linking UI. Interactions here rerun only this
+    fragment, so they don't refetch the page's devices/user or redraw the sidebar.
+    """
     selected_device_name = st.selectbox("Select your desk scanner", options=device_options.keys())
     
     st.subheader("Link Tag to Student")
 
     # This block shows the UI when the scanner is armed and waiting for a card tap.
     if st.session_state.scan_active:
-        st.info("Scanner is active. Please tap a card on the selected device now.")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("Fetch Scanned Card"):
-                tag_id = client.retrieve_scanned_tag()
-                if tag_id:
-                    st.session_state.scanned_tag_id = tag_id
-                    st.session_state.scan_active = False  # Deactivate after successful fetch
-                    st.success(f"Card Scanned! Tag ID: `{tag_id}`")
-                    st.rerun()
-                else:
-                    st.warning("No card has been scanned yet. Please tap a card on the device and try again.")
-        with col2:
-            if st.button("Cancel Scan"):
-                st.session_state.scan_active = False
-                st.rerun()
+        poll_scanned_tag()
+        if st.button("Cancel Scan"):
+            st.session_state.scan_active = False
+            st.rerun(scope="fragment")
     # This block shows the default UI to start the process.
     else:
+        if st.session_state.pop("scan_timed_out", False):
+            st.warning("No card was scanned in time. Please activate the scanner and try again.")
         if st.button("Activate Scanner for Next Scan"):
             device_id = device_options[selected_device_name]
             if client.activate_scanner(device_id):
                 st.session_state.scan_active = True
-                st.rerun()  # Rerun to show the "active" state UI
+                st.session_state.scan_started_at = time.monotonic()
+                st.rerun(scope="fragment")  # Rerun to show the "active" state UI
         
     # This block appears after a tag has been successfully scanned and retrieved.
     if 'scanned_tag_id' in st.session_state:
@@ -240,8 +531,22 @@ def display_rfid_dashboard():
                 if result:
                     st.success(f"Successfully linked tag {tag_id} to {matric_to_link}.")
                     del st.session_state.scanned_tag_id
-                    st.rerun()
-        
+                    st.rerun(scope="fragment")
+
+def display_rfid_dashboard():
+    st.header("RFID Tag Management")
+    
+    # Initialize session state for the scanning workflow
+    if 'scan_active' not in st.session_state:
+        st.session_state.scan_active = False
+
+    device_options = client.get_device_options()
+    if not device_options:
+        st.warning("No RFID scanners registered. Please add one in the Device Management panel.")
+        return
+
+    scan_workflow(device_options)
+
     st.subheader("Unlink a Tag")
     with st.form("unlink_tag_form"):
         tag_to_unlink = st.text_input("Enter Tag ID to unlink")
@@ -254,9 +559,25 @@ def display_rfid_dashboard():
 def display_super_admin_dashboard():
     st.header("Super Admin Panel")
 
+    if st.button("Refresh Dashboard"):
+        # Only evict this admin's entries; other users' cached lists stay warm.
+        for fetch in (_get_all_users, _get_all_devices, _get_device_options):
+            fetch.clear(API_BASE_URL, client.token)
+
+    # The user and device lists are independent, so fetch them in one concurrent round.
+    results = parallel_fetch({
+        "users": client.get_all_users,
+        "devices": client.get_all_devices,
+    })
+
     with st.expander("Manage Users (Admins & Staff)", expanded=False):
         # User management UI here
-        st.info("User management section to be built.")
+        st.subheader("Registered Users")
+        users = results["users"]
+        if users:
+            st.dataframe(users, use_container_width=True)
+        else:
+            st.info("No users found.")
 
     with st.expander("Manage RFID Devices", expanded=True):
         st.subheader("Register New Device")
@@ -272,10 +593,10 @@ def display_super_admin_dashboard():
                     st.rerun()
 
         st.subheader("Registered Devices")
-        devices = client.get_all_devices()
+        devices = results["devices"]
         if devices:
-            df_devices = pd.DataFrame(devices)
-            st.dataframe(df_devices, use_container_width=True)
+            df_devices = build_devices_df(orjson.dumps(devices, option=orjson.OPT_SORT_KEYS))
+            st.dataframe(df_devices, use_container_width=True, column_config=DEVICE_COLUMN_CONFIG)
         else:
             st.info("No devices have been registered yet.")
             
@@ -298,19 +619,16 @@ def main():
             
     # From here, we can safely assume st.session_state.user exists
     user = st.session_state.user
+    full_name, role = user['full_name'], user['role']
     st.sidebar.title("Dashboard")
-    st.sidebar.write(f"Welcome, **{user['full_name']}**")
-    st.sidebar.write(f"Role: **{user['role']}**")
-
-    # Define pages accessible by all logged-in users (Staff + Admin)
-    pages = ["Student Management", "RFID Management"]
-    # Only add Super Admin page if user has the correct role
-    if user['role'] == 'admin':
-        pages.append("Super Admin")
+    st.sidebar.write(f"Welcome, **{full_name}**")
+    st.sidebar.write(f"Role: **{role}**")
 
-    page = st.sidebar.radio("Navigate", pages)
+    page = st.sidebar.radio("Navigate", PAGES_BY_ROLE.get(role, STAFF_PAGES))
     
     if st.sidebar.button("Logout"):
+        # Drop the cached token -> user resolution so the old token can't be reused.
+        _get_current_user.clear(API_BASE_URL, st.session_state.token)
         st.session_state.clear()
         st.rerun()
         
@@ -321,7 +639,7 @@ def main():
         display_rfid_dashboard()
     elif page == "Super Admin":
         # Second check to be absolutely sure
-        if user['role'] == 'admin':
+        if role == 'admin':
             display_super_admin_dashboard()
         else:
             st.error("You are not authorized to view this page.")
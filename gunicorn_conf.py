@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for running the API behind multiple Uvicorn workers.
+
+Usage: gunicorn -c gunicorn_conf.py main:app
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# The admin scanner hand-off (activated_scanners / admin_scanned_tags in
+# src/routers/admin.py) lives in process memory, so a scan must be served by the
+# same worker that activated it. Keep a single worker unless WEB_CONCURRENCY is set
+# explicitly; 2 * CPU + 1 is the usual value once that state is shared.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+max_workers = multiprocessing.cpu_count() * 2 + 1
+workers = max(1, min(workers, max_workers))
+
+keepalive = 5
+timeout = 60
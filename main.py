@@ -1,49 +1,38 @@
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from datetime import datetime
+from fastapi.responses import Response
+from datetime import datetime, timezone
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
-import os
-from fastapi import FastAPI
-from sqlmodel import Session
-from starlette.middleware.cors import CORSMiddleware
+import anyio
+import asyncio
+import time
 
 
+from src.config import settings
 # Correctly import the database table creation function
-from src.database import create_db_and_tables, engine
+from src.database import create_db_and_tables
 # Import all the necessary routers for the application
 from src.routers import students, devices, clearance, token, users, admin
-from src.crud import users as user_crud
-from src.models import UserCreate, Role
+from src.bootstrap import create_initial_admin
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # On startup
     print("Starting up...")
-    create_db_and_tables()
-    
-    # --- Create first superuser ---
-    # This runs only on startup. It checks if an admin exists and creates one if not.
-    # It's best practice to get credentials from environment variables for security.
-    with Session(engine) as session:
-        initial_username = os.getenv("INITIAL_ADMIN_USERNAME", "admin")
-        
-        # Check if the user already exists
-        user = user_crud.get_user_by_username(session, username=initial_username)
-        if not user:
-            print("Initial admin user not found, creating one...")
-            initial_user = UserCreate(
-                username=initial_username,
-                email=os.getenv("INITIAL_ADMIN_EMAIL", "admin@example.com"),
-                full_name="Initial Admin",
-                password=os.getenv("INITIAL_ADMIN_PASSWORD", "changethispassword"),
-                role=Role.ADMIN
-            )
-            user_crud.create_user(db=session, user=initial_user)
-            print("Initial admin user created successfully.")
-        else:
-            print("Initial admin user already exists.")
+    # Password hashing and sync DB calls run in anyio's threadpool; the default of 40
+    # threads serializes concurrent logins under load. Tunable per deployment.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_TOKENS
+    # Under Gunicorn, prestart.sh runs the DDL and bootstrap once instead of every worker racing to.
+    if settings.RUN_DB_MIGRATIONS:
+        # Table creation is blocking I/O, so it runs in a worker thread. It must finish before serving.
+        await asyncio.to_thread(create_db_and_tables)
+
+        # --- Create first superuser ---
+        # The bootstrap (a DB lookup plus a password hash) runs in a worker thread, but is
+        # awaited so the admin exists before requests are served and failures abort startup.
+        await asyncio.to_thread(create_initial_admin)
 
     yield
     # On shutdown
@@ -76,14 +65,20 @@ app = FastAPI(
     openapi_url="/openapi.json",
 )
 
+# Compress responses over 1 KB, e.g. the admin student/user/device lists
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Configure CORS (Cross-Origin Resource Sharing) middleware
 # This allows the frontend (like the Streamlit app) to communicate with the API
+# Origins are pinned (a wildcard is invalid together with credentials) and preflight
+# responses are cached by browsers for a day instead of repeating OPTIONS on every call.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=['*'],  # Allows all origins, consider restricting in production
+    allow_origins=[origin.strip() for origin in settings.CORS_ORIGINS.split(",") if origin.strip()],
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all HTTP methods
-    allow_headers=["*"],  # Allows all headers
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Content-Type", "Authorization", "x-api-key"],
+    max_age=86400,
 )
 
 # Include all the API routers into the main application
@@ -106,21 +101,24 @@ async def read_root():
     """
     return {"message": "Welcome to the Undergraduate Clearance System API. See /docs for details."}
 
+# The static part of the health payload is encoded once; probes hit /health often.
+_STARTED_AT = time.monotonic()
+_HEALTH_PREFIX = f'{{"status":"healthy","version":"{app.version}","timestamp":"'.encode()
+
 @app.get("/health", summary="Health Check", tags=["System"])
 async def health_check():
     """
     Provides a health status check for the API, useful for monitoring and uptime checks.
     """
-    health_status = {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "version": app.version,
-    }
-    return JSONResponse(status_code=200, content=health_status)
+    timestamp = datetime.now(timezone.utc).isoformat()
+    uptime = time.monotonic() - _STARTED_AT
+    body = _HEALTH_PREFIX + f'{timestamp}","uptime_seconds":{uptime:.0f}}}'.encode()
+    return Response(content=body, status_code=200, media_type="application/json")
 
 # This block allows the script to be run directly using `python main.py`
-# It will start the Uvicorn server, which is ideal for development.
+# It will start a single Uvicorn server with auto-reload, which is ideal for development.
+# In production, run behind Gunicorn instead: `gunicorn -c gunicorn_conf.py main:app`
 if __name__ == "__main__":
     print("Starting Uvicorn server for development...")
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools", reload=True)
 
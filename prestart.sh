@@ -0,0 +1,9 @@
+#!/bin/sh
+# Creates the database tables and the initial admin once, then starts the Gunicorn
+# workers with startup DDL disabled so they don't race each other for it.
+set -e
+
+python -c "from src.database import create_db_and_tables; from src.bootstrap import create_initial_admin; create_db_and_tables(); create_initial_admin()"
+
+export RUN_DB_MIGRATIONS=0
+exec gunicorn -c gunicorn_conf.py main:app
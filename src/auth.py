@@ -1,62 +1,133 @@
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlmodel import Session, select
-from typing import List, Optional
-from datetime import datetime, timedelta
+import jwt
+from jwt import InvalidTokenError as JWTError
+from sqlmodel import Session
+from typing import List, Optional, TypedDict
+from datetime import timedelta
+from cachetools import TTLCache
+import hashlib
+import threading
+import time
 
 from src.config import settings
 from src.database import get_session
 from src.crud import users as user_crud
 from src.crud import devices as device_crud
-from src.models import User, Role, Device
-from src.crud.utils import verify_password, hash_password
+from src.models import User, Role
+from src.crud.utils import verify_and_update_password
 
 # --- Configuration ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=True)
 
 # --- JWT Token Functions ---
+# The HMAC key is encoded to bytes once and the algorithm list built once, instead of
+# on every token issued or verified.
+_JWT_KEY = settings.SECRET_KEY.encode()
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+# Every token we issue carries both claims; reject any that don't at decode time.
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    # Integer epoch claims skip the datetime round trip PyJWT would otherwise convert.
+    now = int(time.time())
+    lifetime = int((expires_delta or timedelta(minutes=15)).total_seconds())
+    to_encode.update({"iat": now, "exp": now + lifetime})
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+# --- Auth Caches ---
+# Bearer tokens are replayed on every request until they expire, so the verified
+# payload (keyed by a hash of the token) and the resolved user (keyed by username)
+# are cached briefly to skip the signature check and the user SELECT.
+_payload_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+# clear_user_cache() only reaches the worker process that handled the change; with
+# WEB_CONCURRENCY > 1 the other workers keep serving a deleted, demoted or re-passworded
+# user's cached row until it expires, so the TTL bounds that staleness window.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=15)
+# Devices authenticate every scan with the same, effectively immutable, API key.
+_device_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_cache_lock = threading.Lock()  # Sync dependencies run concurrently in the threadpool
+
+class TokenPayload(TypedDict):
+    """Claims every access token carries; exp and sub are enforced by jwt.decode."""
+    sub: str
+    exp: int
+    iat: int
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+def decode_access_token(token: str) -> TokenPayload:
+    """Verifies and decodes a JWT, reusing a cached payload while it hasn't expired."""
+    key = _token_key(token)
+    with _cache_lock:
+        payload = _payload_cache.get(key)
+    # A cached payload is never served past the token's own expiry.
+    if payload is None or payload.get("exp", 0) <= time.time():
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
+        with _cache_lock:
+            _payload_cache[key] = payload
+    return payload
+
+def get_user_cached(db: Session, username: str) -> Optional[User]:
+    """Resolves a user by username, serving repeat lookups from the user cache."""
+    with _cache_lock:
+        user = _user_cache.get(username)
+    if user is None:
+        user = user_crud.get_user_by_username(db, username=username)
+        if user is None:
+            return None
+        # Detach the shared copy so a commit in this request can't expire it for others.
+        db.expunge(user)
+        with _cache_lock:
+            _user_cache[username] = user
+    return user
+
+def _api_key_digest(api_key: str) -> bytes:
+    return hashlib.blake2b(api_key.encode(), digest_size=16).digest()
+
+def invalidate_device_cache(api_key: str):
+    """Drops a device from the API-key cache; call when it is deleted or deactivated."""
+    with _cache_lock:
+        _device_cache.pop(_api_key_digest(api_key), None)
+
+def clear_user_cache():
+    """Drops all cached users; call after a user's details or role change."""
+    with _cache_lock:
+        _user_cache.clear()
+
 # --- User Authentication ---
 def authenticate_user(db: Session, username: str, password: str):
     """Authenticate user by username and password."""
     user = user_crud.get_user_by_username(db, username=username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        # Upgrade legacy bcrypt hashes to argon2 now that we have the plaintext.
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+        db.refresh(user)
     return user
 
-# --- Dependency for API Key Authentication ---
-
-# def get_api_key(
-#     key: str = Depends(api_key_header), db: Session = Depends(get_session)
-# ) -> Device:
-#     """
-#     Dependency to validate the API key from the x-api-key header.
-#     Ensures the device is registered in the database.
-#     """
-#     db_device = device_crud.get_device_by_api_key(db, api_key=key)
-#     if not db_device:
-#         raise HTTPException(
-#             status_code=status.HTTP_401_UNAUTHORIZED,
-#             detail="Invalid or missing API Key",
-#         )
-#     return db_device
-
-
 # --- Dependency for User Authentication and Authorization ---
+# One dependency callable per distinct role set. FastAPI caches a dependency's result
+# per request by callable identity, so a router-level guard and an endpoint's
+# current_user with the same roles then authenticate the request once, not twice.
+_role_dependencies: dict = {}
+
 def get_current_active_user(required_roles: List[Role] = None):
+    # Built once per role set so each request does a single set lookup.
+    allowed_roles = frozenset(required_roles) if required_roles else None
+    if allowed_roles in _role_dependencies:
+        return _role_dependencies[allowed_roles]
+
     def dependency(
         token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)
     ) -> User:
@@ -66,44 +137,48 @@ def get_current_active_user(required_roles: List[Role] = None):
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-            )
-            username: str = payload.get("sub")
-            if username is None:
-                raise credentials_exception
+            # A missing or null "sub" is already rejected by decode's required claims.
+            username = decode_access_token(token)["sub"]
         except JWTError:
             raise credentials_exception
 
-        user = user_crud.get_user_by_username(db, username=username)
+        user = get_user_cached(db, username=username)
         if user is None:
             raise credentials_exception
 
         # Check for roles if required
-        if required_roles:
-            is_authorized = any(role == user.role for role in required_roles)
-            if not is_authorized:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="The user does not have adequate privileges",
-                )
+        if allowed_roles and user.role not in allowed_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="The user does not have adequate privileges",
+            )
         return user
 
+    _role_dependencies[allowed_roles] = dependency
     return dependency
 
-async def get_api_key(api_key: str = Security(api_key_header), db: Session = Depends(get_session)):
-    """Validate device API key."""
-    if not api_key:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="API key required"
-        )
-    
-    device = device_crud.get_device_by_api_key(db, api_key=api_key)
-    if not device or not device.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or inactive API key"
-        )
-    
+def get_api_key(api_key: str = Security(api_key_header), db: Session = Depends(get_session)):
+    """
+    Validate device API key.
+    Declared sync so FastAPI runs it in the threadpool; the device lookup uses a sync
+    Session and would otherwise block the event loop on every scan.
+    """
+    # A missing or empty header is already rejected by APIKeyHeader(auto_error=True)
+    # before this body runs, so no DB work is done for keyless requests.
+    key = _api_key_digest(api_key)
+    with _cache_lock:
+        device = _device_cache.get(key)
+    if device is None:
+        # The query already filters on is_active, so unknown and inactive keys take
+        # the same path and fail with the same response.
+        device = device_crud.get_device_by_api_key(db, api_key=api_key)
+        if device is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or inactive API key"
+            )
+        db.expunge(device)
+        with _cache_lock:
+            _device_cache[key] = device
+
     return api_key
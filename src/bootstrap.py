@@ -0,0 +1,31 @@
+import os
+from sqlmodel import Session
+
+from src.database import engine
+from src.crud import users as user_crud
+from src.models import UserCreate, Role
+
+def create_initial_admin():
+    """
+    Creates the first superuser if it doesn't exist yet.
+    It's best practice to get credentials from environment variables for security.
+    Called from the app's lifespan, or once from prestart.sh before Gunicorn forks.
+    """
+    with Session(engine) as session:
+        initial_username = os.getenv("INITIAL_ADMIN_USERNAME", "admin")
+        
+        # Check if the user already exists
+        user = user_crud.get_user_by_username(session, username=initial_username)
+        if not user:
+            print("Initial admin user not found, creating one...")
+            initial_user = UserCreate(
+                username=initial_username,
+                email=os.getenv("INITIAL_ADMIN_EMAIL", "admin@example.com"),
+                full_name="Initial Admin",
+                password=os.getenv("INITIAL_ADMIN_PASSWORD", "changethispassword"),
+                role=Role.ADMIN
+            )
+            user_crud.create_user(db=session, user=initial_user)
+            print("Initial admin user created successfully.")
+        else:
+            print("Initial admin user already exists.")
@@ -9,10 +9,13 @@ keeping the router imports clean.
 
 from .students import (
     create_student,
+    create_students_bulk,
     get_all_students,
     get_student_by_id,  # FIX: was get_student_by_student_id
     get_student_by_matric_no,  # ADD: missing import
     get_student_by_tag_id,
+    get_registration_conflicts,
+    get_bulk_registration_conflicts,
     update_student,  # FIX: was update_student_tag_id
     delete_student,
 )
@@ -21,6 +24,8 @@ from .users import (
     get_user_by_username,
     get_user_by_tag_id,
     get_user_by_id,
+    username_exists,
+    email_exists,
     update_user,  # FIX: was update_user_tag_id
     delete_user,
     hash_password,
@@ -31,6 +36,7 @@ from .devices import (
     get_device_by_api_key,
     get_device_by_location,  # ADD: missing
     get_all_devices,  # ADD: missing
+    device_location_exists,
     delete_device,
 )
 from .clearance import (
@@ -49,16 +55,21 @@ __all__ = [
     'get_user_by_username',
     'get_user_by_tag_id',
     'get_user_by_id',
+    'username_exists',
+    'email_exists',
     'update_user',
     'delete_user',
     'hash_password',
     'get_all_users',
     # Students
     'create_student',
+    'create_students_bulk',
     'get_all_students',
     'get_student_by_id',
     'get_student_by_matric_no',
     'get_student_by_tag_id',
+    'get_registration_conflicts',
+    'get_bulk_registration_conflicts',
     'update_student',
     'delete_student',
     # Devices
@@ -66,6 +77,7 @@ __all__ = [
     'get_device_by_api_key',
     'get_device_by_location',
     'get_all_devices',
+    'device_location_exists',
     'delete_device',
     # Clearance
     'update_clearance_status',
@@ -49,10 +49,5 @@ def is_student_fully_cleared(db: Session, matric_no: str) -> bool:
     if not student:
         return False # Or raise an error, depending on desired behavior
 
-    # Check if any of the student's clearance statuses are NOT 'approved'.
-    for status in student.clearance_statuses:
-        if status.status != ClearanceStatusEnum.APPROVED:
-            return False
-            
-    # If the loop completes without returning, all statuses are approved.
-    return True
+    # all() short-circuits on the first status that isn't 'approved'.
+    return all(status.status == ClearanceStatusEnum.APPROVED for status in student.clearance_statuses)
@@ -1,33 +1,32 @@
 from sqlmodel import Session, select
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
 import secrets
 from typing import List, Optional
 
 from src.models import Device, DeviceCreate, Department
 
+# Reused for every device authentication instead of rebuilding the SELECT per request.
+_ACTIVE_DEVICE_BY_API_KEY = select(Device).where(Device.api_key == bindparam("api_key"), Device.is_active == True)
+
 def create_device(db: Session, device: DeviceCreate) -> Optional[Device]:
     """
     Creates a new device for a department.
     Generates a unique API key for authentication.
     Returns None if a device with the same name already exists.
     """
-    # Check for existing device with the same name to prevent duplicates
-    existing_device = db.exec(select(Device).where(Device.device_name == device.device_name)).first()
-    if existing_device:
-        return None
-
     # Generate a secure, URL-safe API key
     api_key = secrets.token_urlsafe(32)
-    
-    db_device = Device(
-        device_name=device.device_name,
-        location=device.location,  # ADD THIS
-        department=device.department,  # ADD THIS
-        api_key=api_key,
-        is_active=True
-    )
-    
+
+    db_device = Device(**device.model_dump(), api_key=api_key, is_active=True)
     db.add(db_device)
-    db.commit()
+    # Let the unique constraint on device_name catch duplicates instead of a separate
+    # SELECT first; this also closes the race between two concurrent registrations.
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(db_device)
     return db_device
 
@@ -37,8 +36,7 @@ def get_device_by_id(db: Session, device_id: int) -> Optional[Device]:
 
 def get_device_by_api_key(db: Session, api_key: str) -> Optional[Device]:
     """Retrieves an active device by its API key."""
-    statement = select(Device).where(Device.api_key == api_key, Device.is_active == True)
-    return db.exec(statement).first()
+    return db.exec(_ACTIVE_DEVICE_BY_API_KEY.params(api_key=api_key)).first()
 
 def get_device_by_name(db: Session, device_name: str) -> Optional[Device]:
     """Retrieves a device by its unique name."""
@@ -81,3 +79,7 @@ def delete_device(db: Session, device_id: int) -> Optional[Device]:
 def get_device_by_location(db: Session, location: str) -> Optional[Device]:
     """Retrieves a device by its location."""
     return db.exec(select(Device).where(Device.location == location)).first()
+
+def device_location_exists(db: Session, location: str) -> bool:
+    """Checks whether a device is already registered at a location, fetching only a primary key."""
+    return db.exec(select(Device.id).where(Device.location == location).limit(1)).first() is not None
@@ -1,10 +1,24 @@
 from sqlmodel import Session, select
-from typing import List, Optional
+from sqlalchemy import bindparam, or_, union_all
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Dict, List, Optional, Set
 
 from src.models import (
     Student, StudentCreate, StudentUpdate, User, Role, ClearanceStatus, ClearanceDepartment, RFIDTag, UserCreate
 )
 from src.crud import users as user_crud
+from src.crud.utils import hash_password, hash_passwords
+
+# --- Prebuilt Statements ---
+# Scan lookups reuse one statement object with a bind parameter instead of rebuilding
+# the joined SELECT on every request.
+_STUDENT_BY_TAG_ID = (
+    select(Student)
+    .join(RFIDTag, RFIDTag.student_id == Student.id)
+    .where(RFIDTag.tag_id == bindparam("tag_id"))
+    .options(joinedload(Student.clearance_statuses))
+)
+
 # --- Read Operations ---
 
 def get_student_by_id(db: Session, student_id: int) -> Optional[Student]:
@@ -16,16 +30,61 @@ def get_student_by_matric_no(db: Session, matric_no: str) -> Optional[Student]:
     return db.exec(select(Student).where(Student.matric_no == matric_no)).first()
 
 def get_student_by_tag_id(db: Session, tag_id: str) -> Optional[Student]:
-    """Get student by RFID tag ID."""
-    from src.models import RFIDTag
-    tag = db.exec(select(RFIDTag).where(RFIDTag.tag_id == tag_id)).first()
-    if tag and tag.student_id:
-        return db.exec(select(Student).where(Student.id == tag.student_id)).first()
-    return None
+    """
+    Get student by RFID tag ID.
+    The tag, the student and their clearance statuses come back in one joined query,
+    since scan handlers read the statuses straight away.
+    """
+    return db.exec(_STUDENT_BY_TAG_ID.params(tag_id=tag_id)).unique().first()
+
+def get_all_students(db: Session, skip: int = 0, limit: int = 100, load_related: bool = False) -> List[Student]:
+    """
+    Retrieves a paginated list of all students.
+    With load_related, every student's clearance statuses and RFID tag are fetched in
+    one extra query each up front instead of lazy SELECTs per student during serialization.
+    """
+    statement = select(Student).offset(skip).limit(limit)
+    if load_related:
+        statement = statement.options(
+            selectinload(Student.clearance_statuses),
+            selectinload(Student.rfid_tag),
+        )
+    return db.exec(statement).all()
 
-def get_all_students(db: Session, skip: int = 0, limit: int = 100) -> List[Student]:
-    """Retrieves a paginated list of all students."""
-    return db.exec(select(Student).offset(skip).limit(limit)).all()
+def get_registration_conflicts(db: Session, matric_no: str, email: str) -> Set[str]:
+    """
+    Returns which of "matric_no" and "email" would clash with an existing student or
+    login account (whose username is the matric number), checked in one query.
+    """
+    statement = union_all(
+        select(Student.matric_no, Student.email).where(or_(Student.matric_no == matric_no, Student.email == email)),
+        select(User.username, User.email).where(or_(User.username == matric_no, User.email == email)),
+    )
+    conflicts = set()
+    for taken_matric_no, taken_email in db.execute(statement):
+        if taken_matric_no == matric_no:
+            conflicts.add("matric_no")
+        if taken_email == email:
+            conflicts.add("email")
+    return conflicts
+
+def get_bulk_registration_conflicts(db: Session, matric_nos: List[str], emails: List[str]) -> Dict[str, List[str]]:
+    """
+    Batch form of get_registration_conflicts: returns the matriculation numbers and
+    emails that clash with existing students or login accounts, checked in one query.
+    """
+    statement = union_all(
+        select(Student.matric_no, Student.email).where(or_(Student.matric_no.in_(matric_nos), Student.email.in_(emails))),
+        select(User.username, User.email).where(or_(User.username.in_(matric_nos), User.email.in_(emails))),
+    )
+    wanted_matric_nos, wanted_emails = set(matric_nos), set(emails)
+    taken_matric_nos, taken_emails = set(), set()
+    for taken_matric_no, taken_email in db.execute(statement):
+        if taken_matric_no in wanted_matric_nos:
+            taken_matric_nos.add(taken_matric_no)
+        if taken_email in wanted_emails:
+            taken_emails.add(taken_email)
+    return {"matric_no": sorted(taken_matric_nos), "email": sorted(taken_emails)}
 
 # --- Write Operations ---
 def create_student(db: Session, student: StudentCreate) -> Student:
@@ -36,31 +95,61 @@ def create_student(db: Session, student: StudentCreate) -> Student:
     """
     # Step 1: Create the associated User account for login purposes.
     # The student's matriculation number is used as their username.
-    user_for_student = StudentCreate(
+    db.add(User(
         username=student.matric_no,
-        password=student.password, # The password from the student creation form
+        hashed_password=hash_password(student.password),
         email=student.email,
         full_name=student.full_name,
-        department=student.department,
-        
-        # role=Role.STUDENT # The role is always 'student'
-    )
-    user_crud.create_user(db, user=user_for_student) # Create the user
+        role=Role.STUDENT,
+    ))
 
     # Step 2: Create the Student profile.
     db_student = Student.model_validate(student)
+
+    # Step 3: Automatically create all necessary clearance status entries for the new student.
+    # Attached through the relationship, the rows go out as one multi-row INSERT in the
+    # same transaction as the user and student, instead of one INSERT per department.
+    db_student.clearance_statuses = [ClearanceStatus(department=dept) for dept in ClearanceDepartment]
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
+    return db_student
+
+def create_students_bulk(db: Session, students: List[StudentCreate]) -> List[Student]:
+    """
+    Creates many students at once, each with its login User account and pending
+    clearance statuses, in a single transaction instead of one commit per student.
+    """
+    db_students = []
+    # Hashing dominates a large import, so all passwords are hashed up front in parallel.
+    hashed_passwords = hash_passwords(student.password for student in students)
+    for student, hashed_password in zip(students, hashed_passwords):
+        db.add(User(
+            username=student.matric_no,
+            hashed_password=hashed_password,
+            email=student.email,
+            full_name=student.full_name,
+            role=Role.STUDENT,
+        ))
+        db_student = Student.model_validate(student)
+        db_student.clearance_statuses = [ClearanceStatus(department=dept) for dept in ClearanceDepartment]
+        db_students.append(db_student)
+
+    db.add_all(db_students)
+    # Read the new IDs before the commit expires the rows, then reload the students with
+    # their statuses and tags in three queries rather than three lazy SELECTs per student
+    # while the response is built.
+    db.flush()
+    ids = [db_student.id for db_student in db_students]
+    db.commit()
+    statement = (
+        select(Student)
+        .where(Student.id.in_(ids))
+        .order_by(Student.id)
+        .options(selectinload(Student.clearance_statuses), selectinload(Student.rfid_tag))
+    )
+    return db.exec(statement).all()
 
-    # Step 3: Automatically create all necessary clearance status entries for the new student.
-    for dept in ClearanceDepartment:
-        status = ClearanceStatus(
-            department=dept,
-            student_id=db_student.id
-        )
-        db.add(status)
-    
 def update_student(db: Session, student: Student, updates: StudentUpdate) -> Student:
     """Updates a student's profile information."""
     student = get_student_by_id(db, student_id=student.id)
@@ -1,5 +1,6 @@
 from sqlmodel import Session, select
-from typing import Optional, Union
+from sqlalchemy.orm import joinedload
+from typing import Optional
 
 from src.models import RFIDTag, User, Student, TagLink
 
@@ -15,23 +16,26 @@ def link_tag(db: Session, link_data: TagLink) -> Optional[RFIDTag]:
     Returns the new RFIDTag object on success, None on failure.
     The calling router is responsible for raising the appropriate HTTP exception.
     """
-    # 1. Check if the tag is already in use
-    existing_tag = db.exec(select(RFIDTag).where(RFIDTag.tag_id == link_data.tag_id)).first()
-    if existing_tag:
-        return None # Failure: Tag already exists
+    # The target person, their current tag and whether the tag is already in use all
+    # come back in one query instead of three round trips.
+    tag_in_use = select(RFIDTag.tag_id).where(RFIDTag.tag_id == link_data.tag_id).exists()
 
-    target_person: Optional[Union[User, Student]] = None
-    
     if link_data.matric_no:
-        target_person = db.exec(select(Student).where(Student.matric_no == link_data.matric_no)).first()
+        statement = select(Student, tag_in_use).where(Student.matric_no == link_data.matric_no).options(joinedload(Student.rfid_tag))
     elif link_data.username:
-        target_person = db.exec(select(User).where(User.username == link_data.username)).first()
+        statement = select(User, tag_in_use).where(User.username == link_data.username).options(joinedload(User.rfid_tag))
     else:
         return None # Failure: No identifier provided
 
-    if not target_person:
+    row = db.exec(statement).first()
+    if not row:
         return None # Failure: Target person not found
-        
+    target_person, tag_taken = row
+
+    # 1. Check if the tag is already in use
+    if tag_taken:
+        return None # Failure: Tag already exists
+
     # 2. Check if the person already has a tag linked
     if target_person.rfid_tag:
         return None # Failure: Person already has a tag
@@ -1,9 +1,16 @@
 from sqlmodel import Session, select
+from sqlalchemy import bindparam
 from typing import List, Optional
 
 from src.models import User, UserCreate, UserUpdate, RFIDTag
 from src.crud.utils import hash_password
 
+# --- Prebuilt Statements ---
+# Hot-path auth lookups reuse one statement object with a bind parameter instead of
+# rebuilding the SELECT on every request.
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_USER_BY_TAG_ID = select(User).join(RFIDTag, RFIDTag.user_id == User.id).where(RFIDTag.tag_id == bindparam("tag_id"))
+
 # --- Read Operations ---
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
@@ -12,19 +19,23 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """Retrieves a user by their unique username."""
-    return db.exec(select(User).where(User.username == username)).first()
+    return db.exec(_USER_BY_USERNAME.params(username=username)).first()
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Retrieves a user by their unique email."""
     return db.exec(select(User).where(User.email == email)).first()
 
+def username_exists(db: Session, username: str) -> bool:
+    """Checks whether a username is taken, fetching only a primary key."""
+    return db.exec(select(User.id).where(User.username == username).limit(1)).first() is not None
+
+def email_exists(db: Session, email: str) -> bool:
+    """Checks whether an email is taken, fetching only a primary key."""
+    return db.exec(select(User.id).where(User.email == email).limit(1)).first() is not None
+
 def get_user_by_tag_id(db: Session, tag_id: str) -> Optional[User]:
-    """Get user by RFID tag ID."""
-    from src.models import RFIDTag
-    tag = db.exec(select(RFIDTag).where(RFIDTag.tag_id == tag_id)).first()
-    if tag and tag.user_id:
-        return db.exec(select(User).where(User.id == tag.user_id)).first()
-    return None
+    """Get user by RFID tag ID, joining through the tag in a single query."""
+    return db.exec(_USER_BY_TAG_ID.params(tag_id=tag_id)).first()
 
 def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
     """Retrieves a paginated list of all users."""
@@ -33,14 +44,7 @@ def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
 def create_user(db: Session, user: UserCreate) -> User:
     """Creates a new user and hashes their password."""
     hashed_password = hash_password(user.password)
-    db_user = User(
-        username=user.username,
-        hashed_password=hashed_password,
-        email=user.email,
-        full_name=user.full_name,
-        role=user.role,
-        department=user.department
-    )
+    db_user = User(**user.model_dump(exclude={"password"}), hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
@@ -1,11 +1,74 @@
 """
 Utility functions for CRUD operations.
 """
-from src.config import settings
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+import bcrypt
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
+
+from src.config import get_password_hasher
 
 # --- Password Hashing ---
+
+# Recent successful verifications, keyed by (stored hash, sha256 of the plaintext) so the
+# plaintext itself is never kept. Retried or repeated logins within the TTL skip the
+# password hash work; a changed password has a new stored hash and so never hits.
+_verified_cache: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_verified_lock = threading.Lock()
+# Prefixes of the bcrypt hashes written before the switch to Argon2id.
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+def _verification_key(plain_password: str, hashed_password: str) -> Tuple[str, bytes]:
+    return hashed_password, hashlib.sha256(plain_password.encode()).digest()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return settings.PWD_CONTEXT.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
 
 def hash_password(password: str) -> str:
-    return settings.PWD_CONTEXT.hash(password)
\ No newline at end of file
+    return get_password_hasher().hash(password)
+
+# argon2-cffi releases the GIL while hashing, so threads spread a batch across cores
+# without the pickling cost of a process pool.
+_hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwhash")
+
+def hash_passwords(passwords: Iterable[str]) -> List[str]:
+    """Hashes a batch of passwords in parallel, preserving order."""
+    return list(_hash_pool.map(hash_password, passwords))
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifies a password and returns a replacement hash if the stored one uses a deprecated scheme."""
+    key = _verification_key(plain_password, hashed_password)
+    with _verified_lock:
+        if key in _verified_cache:
+            return True, None
+    verified, new_hash = _verify_uncached(plain_password, hashed_password)
+    # Only cache successes that need no rehash, so legacy hashes still get upgraded.
+    if verified and new_hash is None:
+        with _verified_lock:
+            _verified_cache[key] = True
+    return verified, new_hash
+
+def _verify_uncached(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Dispatches on the hash prefix straight to argon2-cffi or bcrypt."""
+    if hashed_password.startswith("$argon2"):
+        hasher = get_password_hasher()
+        try:
+            hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False, None
+        if hasher.check_needs_rehash(hashed_password):
+            return True, hash_password(plain_password)
+        return True, None
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        # bcrypt only ever saw the first 72 bytes of the password.
+        try:
+            verified = bcrypt.checkpw(plain_password.encode()[:72], hashed_password.encode())
+        except ValueError:
+            return False, None
+        return verified, hash_password(plain_password) if verified else None
+    return False, None
@@ -6,7 +6,22 @@ from src.config import settings
 # The database URL is constructed from the application settings.
 # This makes it easy to switch between different database environments (e.g., dev, test, prod).
 DATABASE_URL = settings.POSTGRES_URI
-engine = create_engine(DATABASE_URL, echo=True) # echo=True logs SQL queries, useful for debugging
+# One engine (and so one connection pool) per process, shared by every session. It is
+# created at import, which under Gunicorn happens in each worker after the fork.
+# - pool_size/max_overflow: the default pool of 5 starves under concurrent device scans.
+# - pool_pre_ping/pool_recycle: drop connections the server or a proxy has closed instead
+#   of failing the request that picks them up.
+# - query_cache_size raises SQLAlchemy's compiled-statement cache above its default of 500
+#   entries, so every CRUD select() shape stays compiled across requests.
+engine = create_engine(
+    DATABASE_URL,
+    echo=settings.DB_ECHO,  # Set DB_ECHO=1 to log SQL queries while debugging
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    query_cache_size=1200,
+)
 
 # --- Database Initialization ---
 
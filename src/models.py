@@ -55,7 +55,7 @@ class ClearanceStatus(SQLModel, table=True):
     department: ClearanceDepartment
     status: ClearanceStatusEnum = Field(default=ClearanceStatusEnum.PENDING)
     remarks: Optional[str] = None
-    student_id: int = Field(foreign_key="student.id")
+    student_id: int = Field(foreign_key="student.id", index=True)
     student: "Student" = Relationship(back_populates="clearance_statuses")
 
 class RFIDTag(SQLModel, table=True):
@@ -69,7 +69,7 @@ class Device(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     device_name: str = Field(unique=True, index=True)
     api_key: str = Field(unique=True, index=True)
-    location: str
+    location: str = Field(index=True)
     department: Department  # ADD THIS - referenced in devices.py CRUD
     is_active: bool = Field(default=True)
 
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, SQLModel
 from typing import List, Optional, Dict
+from collections import Counter
 
+from src.config import Settings, get_settings
 from src.database import get_session
-from src.auth import get_current_active_user, get_api_key
+from src.auth import get_current_active_user, get_api_key, clear_user_cache, invalidate_device_cache
 from src.models import (
     User, UserCreate, UserRead, UserUpdate, Role,
     Student, StudentCreate, StudentReadWithClearance, StudentUpdate, StudentRead,
@@ -92,15 +94,51 @@ def retrieve_scanned_tag_for_ui(
 @router.post("/students/", response_model=StudentReadWithClearance, status_code=status.HTTP_201_CREATED)
 def create_student(student: StudentCreate, db: Session = Depends(get_session)):
     """(Admin & Staff) Creates a new student and initializes their clearance status."""
-    db_student = student_crud.get_student_by_matric_no(db, matric_no=student.matric_no)
-    if db_student:
+    # Matric number and email clashes, against students and login accounts, in one query.
+    conflicts = student_crud.get_registration_conflicts(db, matric_no=student.matric_no, email=student.email)
+    if "matric_no" in conflicts:
         raise HTTPException(status_code=400, detail="Matriculation number already registered")
+    if "email" in conflicts:
+        raise HTTPException(status_code=400, detail="Email already registered.")
     return student_crud.create_student(db=db, student=student)
 
+@router.post("/students/bulk", response_model=List[StudentReadWithClearance], status_code=status.HTTP_201_CREATED)
+def create_students_bulk(
+    students: List[StudentCreate],
+    db: Session = Depends(get_session),
+    settings: Settings = Depends(get_settings),
+):
+    """(Admin & Staff) Creates many students in one request and one database transaction."""
+    # Larger cohorts are sent in several requests; see BULK_IMPORT_MAX_STUDENTS.
+    if len(students) > settings.BULK_IMPORT_MAX_STUDENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_IMPORT_MAX_STUDENTS} students can be imported per request.",
+        )
+    matric_nos = [student.matric_no for student in students]
+    emails = [student.email for student in students]
+
+    # Reject clashes inside the upload itself...
+    duplicate_matric_nos = sorted(m for m, n in Counter(matric_nos).items() if n > 1)
+    if duplicate_matric_nos:
+        raise HTTPException(status_code=400, detail=f"Duplicate matriculation numbers in the upload: {', '.join(duplicate_matric_nos)}")
+    duplicate_emails = sorted(e for e, n in Counter(emails).items() if n > 1)
+    if duplicate_emails:
+        raise HTTPException(status_code=400, detail=f"Duplicate emails in the upload: {', '.join(duplicate_emails)}")
+
+    # ...and against existing students and login accounts, in one query.
+    conflicts = student_crud.get_bulk_registration_conflicts(db, matric_nos=matric_nos, emails=emails)
+    if conflicts["matric_no"]:
+        raise HTTPException(status_code=400, detail=f"Matriculation numbers already registered: {', '.join(conflicts['matric_no'])}")
+    if conflicts["email"]:
+        raise HTTPException(status_code=400, detail=f"Emails already registered: {', '.join(conflicts['email'])}")
+    return student_crud.create_students_bulk(db=db, students=students)
+
 @router.get("/students/", response_model=List[StudentReadWithClearance])
 def read_all_students(skip: int = 0, limit: int = 100, db: Session = Depends(get_session)):
     """(Admin & Staff) Retrieves a list of all student records."""
-    return student_crud.get_all_students(db, skip=skip, limit=limit)
+    # The response includes each student's clearance statuses and tag, so load them in bulk.
+    return student_crud.get_all_students(db, skip=skip, limit=limit, load_related=True)
 
 @router.get("/students/lookup", response_model=StudentReadWithClearance)
 def lookup_student(
@@ -184,9 +222,9 @@ def require_super_admin(current_user: User = Depends(get_current_active_user()))
 )
 def create_user_as_admin(user: UserCreate, db: Session = Depends(get_session)):
     """(Super Admin Only) Creates a new user (admin or staff)."""
-    if user_crud.get_user_by_username(db, username=user.username):
+    if user_crud.username_exists(db, username=user.username):
         raise HTTPException(status_code=400, detail="Username already registered.")
-    if user_crud.get_user_by_email(db, email=user.email):
+    if user_crud.email_exists(db, email=user.email):
         raise HTTPException(status_code=400, detail="Email already registered.")
     return user_crud.create_user(db=db, user=user)
 
@@ -220,9 +258,11 @@ def lookup_user(
 @router.put("/users/{user_id}", response_model=UserRead, dependencies=[Depends(require_super_admin)])
 def update_user_details(user_id: int, user: UserUpdate, db: Session = Depends(get_session)):
     """(Super Admin Only) Updates a user's details (e.g., role)."""
-    updated_user = user_crud.update_user(db, user_id=user_id, user_update=user)
-    if not updated_user:
+    db_user = user_crud.get_user_by_id(db, user_id=user_id)
+    if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    updated_user = user_crud.update_user(db, user=db_user, updates=user)
+    clear_user_cache()
     return updated_user
 
 @router.delete("/users/{user_id}", response_model=UserRead, dependencies=[Depends(require_super_admin)])
@@ -233,6 +273,7 @@ def delete_user_account(user_id: int, db: Session = Depends(get_session), curren
     deleted_user = user_crud.delete_user(db, user_id=user_id)
     if not deleted_user:
         raise HTTPException(status_code=404, detail="User not found")
+    clear_user_cache()
     return deleted_user
 
 @router.delete("/students/{student_id}", response_model=StudentRead, dependencies=[Depends(require_super_admin)])
@@ -241,15 +282,19 @@ def delete_student_record(student_id: int, db: Session = Depends(get_session)):
     deleted_student = student_crud.delete_student(db, student_id=student_id)
     if not deleted_student:
         raise HTTPException(status_code=404, detail="Student not found")
+    # The student's login account went with them; stop serving it from the auth cache.
+    clear_user_cache()
     return deleted_student
 
 @router.post("/devices/", response_model=DeviceRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_super_admin)])
 def create_device(device: DeviceCreate, db: Session = Depends(get_session)):
     """(Super Admin Only) Registers a new RFID hardware device."""
-    db_device = device_crud.get_device_by_location(db, location=device.location)
-    if db_device:
+    if device_crud.device_location_exists(db, location=device.location):
         raise HTTPException(status_code=400, detail=f"A device at location '{device.location}' already exists.")
-    return device_crud.create_device(db=db, device=device)
+    db_device = device_crud.create_device(db=db, device=device)
+    if db_device is None:
+        raise HTTPException(status_code=400, detail=f"A device named '{device.device_name}' already exists.")
+    return db_device
 
 @router.get("/devices/", response_model=List[DeviceRead], dependencies=[Depends(require_super_admin)])
 def read_all_devices(db: Session = Depends(get_session)):
@@ -262,4 +307,5 @@ def delete_device_registration(device_id: int, db: Session = Depends(get_session
     deleted_device = device_crud.delete_device(db, device_id=device_id)
     if not deleted_device:
         raise HTTPException(status_code=404, detail="Device not found")
+    invalidate_device_cache(deleted_device.api_key)
     return deleted_device
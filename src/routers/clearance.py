@@ -3,7 +3,7 @@ from sqlmodel import Session
 
 from src.database import get_session
 from src.auth import get_current_active_user
-from src.models import User, Role, ClearanceStatus, ClearanceUpdate, ClearanceStatusRead
+from src.models import User, Role, ClearanceStatus, ClearanceUpdate, ClearanceStatusRead, StudentReadWithClearance
 from src.crud import clearance as clearance_crud
 
 router = APIRouter(
@@ -36,3 +36,23 @@ def update_student_clearance_status(
         )
         
     return updated_status
+
+
+@router.put("/with-student", response_model=StudentReadWithClearance)
+def update_clearance_and_return_student(
+    clearance_update: ClearanceUpdate,
+    db: Session = Depends(get_session),
+):
+    """
+    Updates a student's clearance status and returns the student's full record,
+    so clients can refresh their view without a second lookup request.
+    """
+    updated_status = clearance_crud.update_clearance_status(db, clearance_update)
+
+    if not updated_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No clearance record found for student {clearance_update.matric_no} in department {clearance_update.department}"
+        )
+
+    return updated_status.student
@@ -3,7 +3,7 @@ from sqlmodel import Session
 from typing import List
 
 from src.database import get_session
-from src.auth import get_current_active_user
+from src.auth import get_current_active_user, invalidate_device_cache
 from src.models import Role, Device, DeviceCreate, DeviceRead
 from src.crud import devices as device_crud
 
@@ -26,15 +26,20 @@ def create_device(
     A device's location must be unique.
     """
     # Check if a device with the same location already exists
-    db_device = device_crud.get_device_by_location(db, location=device.location)
-    if db_device:
+    if device_crud.device_location_exists(db, location=device.location):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"A device at location '{device.location}' already exists."
         )
     
     # Create the new device and its API key
-    return device_crud.create_device(db=db, device=device)
+    db_device = device_crud.create_device(db=db, device=device)
+    if db_device is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A device named '{device.device_name}' already exists."
+        )
+    return db_device
 
 
 @router.get("/", response_model=List[DeviceRead])
@@ -65,4 +70,5 @@ def delete_device(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found."
         )
+    invalidate_device_cache(db_device.api_key)
     return db_device
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Security
-from fastapi.security import APIKeyHeader
 from sqlmodel import Session
 
 from src.database import get_session
@@ -8,9 +7,8 @@ from src.models import RFIDStatusResponse, RFIDScanRequest, ClearanceStatusEnum
 from src.crud import students as student_crud
 from src.crud import users as user_crud
 
-# Define the router and the API key security scheme
+# Define the router; devices authenticate through the shared get_api_key dependency
 router = APIRouter(prefix="/rfid", tags=["RFID"])
-api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 
 @router.post("/check-status", response_model=RFIDStatusResponse)
 def check_rfid_status(
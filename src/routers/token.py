@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from datetime import timedelta
 
 from src.database import get_session
 from src.auth import authenticate_user, create_access_token
 from src.models import Token
-from src.config import settings
+from src.config import Settings, get_settings
 
 router = APIRouter(tags=["Authentication"])
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    settings: Settings = Depends(get_settings),
 ):
     """
     Provides a JWT access token for a valid user (student or staff).
@@ -22,8 +24,9 @@ async def login_for_access_token(
     password flow. The client sends 'username' and 'password' in a
     form-data body.
     """
-    # The authenticate_user function will check both Student and User tables
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # The authenticate_user function will check both Student and User tables.
+    # It runs an Argon2 verify (bcrypt for legacy hashes, CPU-bound) and a sync DB query, so it's kept off the event loop.
+    user = await run_in_threadpool(authenticate_user, db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -1,13 +1,30 @@
+import os
+import tempfile
+
+# The SQLite test database lives in a throwaway directory, so test runs leave no
+# test.db behind in the checkout.
+_database_dir = tempfile.TemporaryDirectory()
+DATABASE_URL = f"sqlite:///{os.path.join(_database_dir.name, 'test.db')}"
+
+# Point the app at the SQLite test database and skip the startup DDL/bootstrap before
+# anything under src/ reads the settings. Cheap Argon2 parameters keep login tests fast.
+os.environ["POSTGRES_URI"] = DATABASE_URL
+os.environ["RUN_DB_MIGRATIONS"] = "0"
+os.environ["PASSWORD_HASH_TIME_COST"] = "1"
+os.environ["PASSWORD_HASH_MEMORY_KIB"] = "1024"
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
-from main import app, get_session
+from main import app
+from src.database import get_session
+from src import auth
+from src.crud import utils as crud_utils
+from src.crud.utils import hash_password
+from src.models import Role, User
 
 # --- Test Database Setup ---
 
-# Define the connection string for a test database. 
-# Using SQLite in-memory is fast and simple for testing.
-DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
 
@@ -21,6 +38,17 @@ def override_get_session():
 app.dependency_overrides[get_session] = override_get_session
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    """
+    The auth caches are process-wide, so entries from one test (e.g. a user or device
+    with the same name in a since-dropped database) must not leak into the next.
+    """
+    for cache in (auth._payload_cache, auth._user_cache, auth._device_cache, crud_utils._verified_cache):
+        cache.clear()
+    yield
+
+
 @pytest.fixture(scope="function", name="db")
 def get_db_session():
     """
@@ -39,3 +67,41 @@ def get_test_client():
     """
     with TestClient(app) as client:
         yield client
+
+
+@pytest.fixture(name="admin_user")
+def get_admin_user(db: Session) -> User:
+    """
+    Pytest fixture to create an admin account in the fresh test database.
+    """
+    user = User(
+        username="fixtureadmin",
+        email="fixtureadmin@example.com",
+        full_name="Test Admin",
+        hashed_password=hash_password("admin_password"),
+        role=Role.ADMIN,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture(name="auth_headers")
+def get_auth_headers(client: TestClient):
+    """
+    Pytest fixture returning a helper that logs a user in and returns their Authorization header.
+    """
+    def login(username: str, password: str) -> dict:
+        response = client.post("/token", data={"username": username, "password": password})
+        assert response.status_code == 200, f"Failed to get token for {username}"
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return login
+
+
+@pytest.fixture(name="admin_headers")
+def get_admin_headers(admin_user: User, auth_headers) -> dict:
+    """
+    Pytest fixture to log in as the admin account and return its Authorization header.
+    """
+    return auth_headers(admin_user.username, "admin_password")
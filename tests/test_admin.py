@@ -1,9 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlalchemy import event
+from sqlmodel import Session, select
 
 from main import app  # Assuming your FastAPI app instance is in main.py
-from src.models import Role, User, Student, Department, ClearanceStatus
+from src.config import Settings, get_settings
+from src.models import Role, User, Student, Department, ClearanceStatus, RFIDTag
 
 # TestClient allows us to make requests to our app in tests
 client = TestClient(app)
@@ -115,3 +117,145 @@ def test_user_creation_permissions():
     assert response.status_code == 201
     assert response.json()["username"] == "anotherstaff"
 
+
+
+# --- Bulk Student Import ---
+
+def bulk_student(n: int, **overrides) -> dict:
+    student = {
+        "full_name": f"Bulk Student {n}",
+        "matric_no": f"F/HD/21/10000{n}",
+        "email": f"bulk{n}@example.com",
+        "department": Department.COMPUTER_SCIENCE,
+        "password": "student_password",
+    }
+    student.update(overrides)
+    return student
+
+
+def test_bulk_import_creates_students(db: Session, client, admin_headers):
+    response = client.post("/admin/students/bulk", json=[bulk_student(1), bulk_student(2)], headers=admin_headers)
+    assert response.status_code == 201
+    body = response.json()
+    assert [s["matric_no"] for s in body] == ["F/HD/21/100001", "F/HD/21/100002"]
+    assert all(len(s["clearance_statuses"]) > 0 for s in body)
+    # Each student also gets a login account named after their matric number.
+    assert db.exec(select(User).where(User.username == "F/HD/21/100001")).first() is not None
+
+
+def test_bulk_import_rejects_oversized_uploads(db: Session, client, admin_headers):
+    app.dependency_overrides[get_settings] = lambda: Settings(BULK_IMPORT_MAX_STUDENTS=2)
+    try:
+        response = client.post("/admin/students/bulk", json=[bulk_student(n) for n in range(1, 4)], headers=admin_headers)
+    finally:
+        del app.dependency_overrides[get_settings]
+    assert response.status_code == 413
+    assert db.exec(select(Student)).first() is None
+
+
+@pytest.mark.parametrize("duplicate, conflict", [
+    ({"matric_no": "F/HD/21/100001"}, "F/HD/21/100001"),
+    ({"email": "bulk1@example.com"}, "bulk1@example.com"),
+])
+def test_bulk_import_rejects_duplicates_in_upload(db: Session, client, admin_headers, duplicate, conflict):
+    response = client.post("/admin/students/bulk", json=[bulk_student(1), bulk_student(2, **duplicate)], headers=admin_headers)
+    assert response.status_code == 400
+    assert conflict in response.json()["detail"]
+    assert db.exec(select(Student)).first() is None
+
+
+@pytest.mark.parametrize("clash, conflict", [
+    ({"matric_no": "F/HD/21/100001"}, "F/HD/21/100001"),   # existing student
+    ({"email": "bulk1@example.com"}, "bulk1@example.com"),  # existing student's email
+])
+def test_bulk_import_rejects_conflicts_with_existing_students(db: Session, client, admin_headers, clash, conflict):
+    response = client.post("/admin/students/bulk", json=[bulk_student(1)], headers=admin_headers)
+    assert response.status_code == 201
+
+    response = client.post("/admin/students/bulk", json=[bulk_student(3, **clash)], headers=admin_headers)
+    assert response.status_code == 400
+    assert conflict in response.json()["detail"]
+    assert db.exec(select(Student).where(Student.full_name == "Bulk Student 3")).first() is None
+
+
+@pytest.mark.parametrize("field, login_field", [
+    ("matric_no", "username"),  # existing login username
+    ("email", "email"),         # existing login email
+])
+def test_bulk_import_rejects_conflicts_with_existing_logins(db: Session, client, admin_user, admin_headers, field, login_field):
+    taken = getattr(admin_user, login_field)
+    response = client.post("/admin/students/bulk", json=[bulk_student(3, **{field: taken})], headers=admin_headers)
+    assert response.status_code == 400
+    assert taken in response.json()["detail"]
+    assert db.exec(select(Student)).first() is None
+
+
+# --- Query Counts ---
+
+def count_statements(db: Session, request, prefix: str = "") -> int:
+    """Counts the SQL statements (optionally only those starting with prefix) request() executes."""
+    engine = db.get_bind()
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(prefix):
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        request()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def count_listing_statements(db: Session, client, headers, limit: int) -> int:
+    """Counts the SQL statements one GET /admin/students/ page executes."""
+    def request():
+        response = client.get("/admin/students/", params={"limit": limit}, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+    return count_statements(db, request)
+
+
+def count_bulk_import_selects(db: Session, client, headers, students: list) -> int:
+    """
+    Counts the SELECTs one POST /admin/students/bulk executes. INSERTs are left out:
+    whether rows are batched into one statement depends on the database driver.
+    """
+    def request():
+        response = client.post("/admin/students/bulk", json=students, headers=headers)
+        assert response.status_code == 201
+        assert len(response.json()) == len(students)
+    return count_statements(db, request, prefix="SELECT")
+
+
+def test_bulk_import_select_count_is_independent_of_upload_size(db: Session, client, admin_headers):
+    # Resolve (and cache) the admin behind the token first, so both counts skip that lookup.
+    assert client.get("/users/me", headers=admin_headers).status_code == 200
+    small = count_bulk_import_selects(db, client, admin_headers, [bulk_student(n) for n in range(1, 3)])
+    large = count_bulk_import_selects(db, client, admin_headers, [bulk_student(n) for n in range(3, 9)])
+    assert small == large
+
+
+def test_student_listing_query_count_is_independent_of_page_size(db: Session, client, admin_headers):
+    students = [bulk_student(n) for n in range(1, 7)]
+    response = client.post("/admin/students/bulk", json=students, headers=admin_headers)
+    assert response.status_code == 201
+    # Tag some of the students so the listing serializes a mix of linked and unlinked tags.
+    for student in response.json()[::2]:
+        db.add(RFIDTag(tag_id=f"TAG{student['id']}", student_id=student["id"]))
+    db.commit()
+
+    assert count_listing_statements(db, client, admin_headers, limit=2) == count_listing_statements(db, client, admin_headers, limit=6)
+
+
+# --- Device Registration ---
+
+def test_create_device_with_duplicate_name_is_rejected(client, admin_headers):
+    device = {"device_name": "Main Gate", "location": "Gate A", "department": Department.ENGINEERING}
+    response = client.post("/admin/devices/", json=device, headers=admin_headers)
+    assert response.status_code == 201
+    assert response.json()["api_key"]
+
+    response = client.post("/admin/devices/", json={**device, "location": "Gate B"}, headers=admin_headers)
+    assert response.status_code == 400
+    assert "Main Gate" in response.json()["detail"]
@@ -0,0 +1,135 @@
+import bcrypt
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from src import auth
+from src.crud import utils as crud_utils
+from src.crud.utils import hash_password, verify_and_update_password
+from src.models import Department, Device, Role, User
+
+# --- Helpers ---
+
+def create_user(db: Session, username: str, password: str, role: Role, hashed_password: str = None) -> User:
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        full_name=username.title(),
+        hashed_password=hashed_password or hash_password(password),
+        role=role,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+# --- Device API key cache ---
+
+def test_deleted_device_is_rejected(db: Session, client, admin_headers):
+    """A device deleted through the API stops authenticating even though its key was cached."""
+    device = Device(device_name="Library Desk", location="Library", department=Department.ENGINEERING, api_key="device-key-1", is_active=True)
+    db.add(device)
+    db.commit()
+    db.refresh(device)
+
+    # The first lookup caches the device.
+    assert auth.get_api_key(api_key="device-key-1", db=db) == "device-key-1"
+
+    response = client.delete(f"/admin/devices/{device.id}", headers=admin_headers)
+    assert response.status_code == 200
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_api_key(api_key="device-key-1", db=db)
+    assert exc_info.value.status_code == 401
+
+
+def test_invalidate_device_cache_drops_cached_device(db: Session):
+    device = Device(device_name="Bursary Desk", location="Bursary", department=Department.LAW, api_key="device-key-2", is_active=True)
+    db.add(device)
+    db.commit()
+    assert auth.get_api_key(api_key="device-key-2", db=db) == "device-key-2"
+
+    # Removed behind the cache's back: still served until invalidated.
+    db.delete(device)
+    db.commit()
+    assert auth.get_api_key(api_key="device-key-2", db=db) == "device-key-2"
+
+    auth.invalidate_device_cache("device-key-2")
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_api_key(api_key="device-key-2", db=db)
+    assert exc_info.value.status_code == 401
+
+
+# --- Password verification cache ---
+
+def test_wrong_password_is_never_served_from_cache():
+    hashed = hash_password("right-password")
+
+    assert verify_and_update_password("right-password", hashed) == (True, None)
+    assert crud_utils._verification_key("right-password", hashed) in crud_utils._verified_cache
+
+    # A wrong password misses the cache and fails, however often it is tried.
+    for _ in range(2):
+        assert verify_and_update_password("wrong-password", hashed) == (False, None)
+    assert crud_utils._verification_key("wrong-password", hashed) not in crud_utils._verified_cache
+
+
+def test_bcrypt_hash_is_upgraded_to_argon2_on_login(db: Session, client):
+    legacy_hash = bcrypt.hashpw(b"legacy_password", bcrypt.gensalt(rounds=4)).decode()
+    user = create_user(db, "legacyuser", "legacy_password", Role.STAFF, hashed_password=legacy_hash)
+
+    response = client.post("/token", data={"username": "legacyuser", "password": "legacy_password"})
+    assert response.status_code == 200
+
+    db.refresh(user)
+    assert user.hashed_password.startswith("$argon2id$")
+    assert verify_and_update_password("legacy_password", user.hashed_password)[0]
+
+    # The upgraded hash keeps working for the next login.
+    response = client.post("/token", data={"username": "legacyuser", "password": "legacy_password"})
+    assert response.status_code == 200
+
+
+# --- User cache invalidation ---
+
+def test_deleted_student_token_is_rejected(client, admin_headers, auth_headers):
+    student = {
+        "full_name": "Cached Student",
+        "matric_no": "F/HD/21/424242",
+        "email": "cached.student@example.com",
+        "department": Department.LAW,
+        "password": "student_password",
+    }
+    response = client.post("/admin/students/", json=student, headers=admin_headers)
+    assert response.status_code == 201
+    student_id = response.json()["id"]
+
+    # Authenticated (and cached) but not allowed: 403 rather than 401.
+    student_headers = auth_headers(student["matric_no"], student["password"])
+    assert client.get("/users/me", headers=student_headers).status_code == 403
+
+    response = client.delete(f"/admin/students/{student_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/users/me", headers=student_headers).status_code == 401
+
+
+def test_deleted_user_token_is_rejected(db: Session, client, admin_headers, auth_headers):
+    staff = create_user(db, "cachedstaff", "staff_password", Role.STAFF)
+    staff_headers = auth_headers("cachedstaff", "staff_password")
+    assert client.get("/users/me", headers=staff_headers).status_code == 200
+
+    response = client.delete(f"/admin/users/{staff.id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/users/me", headers=staff_headers).status_code == 401
+
+
+def test_demoted_user_loses_access(db: Session, client, admin_headers, auth_headers):
+    staff = create_user(db, "demotedstaff", "staff_password", Role.STAFF)
+    staff_headers = auth_headers("demotedstaff", "staff_password")
+    assert client.get("/users/me", headers=staff_headers).status_code == 200
+
+    response = client.put(f"/admin/users/{staff.id}", json={"role": Role.STUDENT}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["role"] == Role.STUDENT
+    assert client.get("/users/me", headers=staff_headers).status_code == 403
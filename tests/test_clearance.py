@@ -0,0 +1,57 @@
+from src.models import ClearanceDepartment, ClearanceStatusEnum, Department
+
+STUDENT = {
+    "full_name": "Clearance Student",
+    "matric_no": "F/HD/21/555555",
+    "email": "clearance.student@example.com",
+    "department": Department.LAW,
+    "password": "student_password",
+}
+
+
+# --- Helpers ---
+
+def register_student(client, admin_headers: dict) -> None:
+    """Registers STUDENT through the API as the admin."""
+    response = client.post("/admin/students/", json=STUDENT, headers=admin_headers)
+    assert response.status_code == 201
+
+
+# --- PUT /clearance/with-student ---
+
+def test_update_with_student_returns_fresh_statuses(client, admin_headers):
+    register_student(client, admin_headers)
+    update = {
+        "matric_no": STUDENT["matric_no"],
+        "department": ClearanceDepartment.LIBRARY,
+        "status": ClearanceStatusEnum.APPROVED,
+        "remarks": "No outstanding books",
+    }
+
+    response = client.put("/clearance/with-student", json=update, headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["matric_no"] == STUDENT["matric_no"]
+
+    statuses = {s["department"]: s for s in data["clearance_statuses"]}
+    assert len(statuses) == len(ClearanceDepartment)
+    assert statuses[ClearanceDepartment.LIBRARY]["status"] == ClearanceStatusEnum.APPROVED
+    assert statuses[ClearanceDepartment.LIBRARY]["remarks"] == "No outstanding books"
+    assert statuses[ClearanceDepartment.BURSARY]["status"] == ClearanceStatusEnum.PENDING
+
+
+def test_update_with_student_unknown_matric_returns_404(client, admin_headers):
+    register_student(client, admin_headers)
+    update = {"matric_no": "F/HD/21/000000", "department": ClearanceDepartment.LIBRARY, "status": ClearanceStatusEnum.APPROVED}
+
+    response = client.put("/clearance/with-student", json=update, headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_update_with_student_forbidden_for_students(client, admin_headers, auth_headers):
+    register_student(client, admin_headers)
+    student_headers = auth_headers(STUDENT["matric_no"], STUDENT["password"])
+    update = {"matric_no": STUDENT["matric_no"], "department": ClearanceDepartment.LIBRARY, "status": ClearanceStatusEnum.APPROVED}
+
+    response = client.put("/clearance/with-student", json=update, headers=student_headers)
+    assert response.status_code == 403